@@ -164,15 +164,8 @@ class Billboard(Node):
 
             # Transform ndc coordinates to world coordinates.
             world_from_ndc = np.linalg.inv(ndc_from_world)
-
-            def transform(x):
-                v = world_from_ndc @ np.append(x, 1.0)
-                v = v[:3] / v[3]
-                return v
-
-            corners = np.apply_along_axis(transform, 1, corners)
-
-            all_corners[i] = corners
+            v = np.hstack([corners, np.ones((4, 1))]) @ world_from_ndc.T
+            all_corners[i] = v[:, :3] / v[:, 3:4]
 
         camera.current_frame_id = frame_id
 
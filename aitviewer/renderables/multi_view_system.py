@@ -103,7 +103,7 @@ class MultiViewSystem(Node):
         # to compute the distance at which to show the billboards.
         positions = np.array(positions)
         camera_center = np.mean(positions, 0)
-        max_dist = np.max(np.apply_along_axis(lambda x: np.linalg.norm(x - camera_center), 1, positions))
+        max_dist = np.max(np.linalg.norm(positions - camera_center, axis=1))
         self.billboard_distance = max_dist * 2
         self.camera_positions = positions
 
@@ -0,0 +1,242 @@
+"""
+Copyright (C) 2022  ETH Zurich, Manuel Kaufmann, Velko Vechev, Dario Mylonopoulos
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import importlib.util
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+# Importing numba and compiling the kernels takes from a fraction of a second up to several seconds on a cold cache.
+# This is done in a background thread started by warmup_frustum_lines(), frustum_lines() uses the NumPy
+# implementation until the numba kernel is ready so that it never blocks the UI thread.
+HAS_NUMBA = importlib.util.find_spec("numba") is not None
+_numba_ready = threading.Event()
+_warmup_thread = None
+
+
+def _adjugate4x4(m, inv):
+    """
+    Write the adjugate of a 4-by-4 matrix into `inv` and return its determinant.
+    The 16 entries of the matrix are given in row-major order in `m`, each entry can either be a scalar or a np array,
+    in which case all entries must have the same shape and many matrices are handled at once.
+    """
+    inv[0] = (
+        m[5] * m[10] * m[15]
+        - m[5] * m[11] * m[14]
+        - m[9] * m[6] * m[15]
+        + m[9] * m[7] * m[14]
+        + m[13] * m[6] * m[11]
+        - m[13] * m[7] * m[10]
+    )
+    inv[4] = (
+        -m[4] * m[10] * m[15]
+        + m[4] * m[11] * m[14]
+        + m[8] * m[6] * m[15]
+        - m[8] * m[7] * m[14]
+        - m[12] * m[6] * m[11]
+        + m[12] * m[7] * m[10]
+    )
+    inv[8] = (
+        m[4] * m[9] * m[15]
+        - m[4] * m[11] * m[13]
+        - m[8] * m[5] * m[15]
+        + m[8] * m[7] * m[13]
+        + m[12] * m[5] * m[11]
+        - m[12] * m[7] * m[9]
+    )
+    inv[12] = (
+        -m[4] * m[9] * m[14]
+        + m[4] * m[10] * m[13]
+        + m[8] * m[5] * m[14]
+        - m[8] * m[6] * m[13]
+        - m[12] * m[5] * m[10]
+        + m[12] * m[6] * m[9]
+    )
+    inv[1] = (
+        -m[1] * m[10] * m[15]
+        + m[1] * m[11] * m[14]
+        + m[9] * m[2] * m[15]
+        - m[9] * m[3] * m[14]
+        - m[13] * m[2] * m[11]
+        + m[13] * m[3] * m[10]
+    )
+    inv[5] = (
+        m[0] * m[10] * m[15]
+        - m[0] * m[11] * m[14]
+        - m[8] * m[2] * m[15]
+        + m[8] * m[3] * m[14]
+        + m[12] * m[2] * m[11]
+        - m[12] * m[3] * m[10]
+    )
+    inv[9] = (
+        -m[0] * m[9] * m[15]
+        + m[0] * m[11] * m[13]
+        + m[8] * m[1] * m[15]
+        - m[8] * m[3] * m[13]
+        - m[12] * m[1] * m[11]
+        + m[12] * m[3] * m[9]
+    )
+    inv[13] = (
+        m[0] * m[9] * m[14]
+        - m[0] * m[10] * m[13]
+        - m[8] * m[1] * m[14]
+        + m[8] * m[2] * m[13]
+        + m[12] * m[1] * m[10]
+        - m[12] * m[2] * m[9]
+    )
+    inv[2] = (
+        m[1] * m[6] * m[15]
+        - m[1] * m[7] * m[14]
+        - m[5] * m[2] * m[15]
+        + m[5] * m[3] * m[14]
+        + m[13] * m[2] * m[7]
+        - m[13] * m[3] * m[6]
+    )
+    inv[6] = (
+        -m[0] * m[6] * m[15]
+        + m[0] * m[7] * m[14]
+        + m[4] * m[2] * m[15]
+        - m[4] * m[3] * m[14]
+        - m[12] * m[2] * m[7]
+        + m[12] * m[3] * m[6]
+    )
+    inv[10] = (
+        m[0] * m[5] * m[15]
+        - m[0] * m[7] * m[13]
+        - m[4] * m[1] * m[15]
+        + m[4] * m[3] * m[13]
+        + m[12] * m[1] * m[7]
+        - m[12] * m[3] * m[5]
+    )
+    inv[14] = (
+        -m[0] * m[5] * m[14]
+        + m[0] * m[6] * m[13]
+        + m[4] * m[1] * m[14]
+        - m[4] * m[2] * m[13]
+        - m[12] * m[1] * m[6]
+        + m[12] * m[2] * m[5]
+    )
+    inv[3] = (
+        -m[1] * m[6] * m[11]
+        + m[1] * m[7] * m[10]
+        + m[5] * m[2] * m[11]
+        - m[5] * m[3] * m[10]
+        - m[9] * m[2] * m[7]
+        + m[9] * m[3] * m[6]
+    )
+    inv[7] = (
+        m[0] * m[6] * m[11]
+        - m[0] * m[7] * m[10]
+        - m[4] * m[2] * m[11]
+        + m[4] * m[3] * m[10]
+        + m[8] * m[2] * m[7]
+        - m[8] * m[3] * m[6]
+    )
+    inv[11] = (
+        -m[0] * m[5] * m[11]
+        + m[0] * m[7] * m[9]
+        + m[4] * m[1] * m[11]
+        - m[4] * m[3] * m[9]
+        - m[8] * m[1] * m[7]
+        + m[8] * m[3] * m[5]
+    )
+    inv[15] = (
+        m[0] * m[5] * m[10]
+        - m[0] * m[6] * m[9]
+        - m[4] * m[1] * m[10]
+        + m[4] * m[2] * m[9]
+        + m[8] * m[1] * m[6]
+        - m[8] * m[2] * m[5]
+    )
+
+    return m[0] * inv[0] + m[1] * inv[4] + m[2] * inv[8] + m[3] * inv[12]
+
+
+def _inv4x4_batched(M):
+    """Closed-form inverse of a np array of shape (N, 4, 4) of matrices, without the per-matrix overhead of LAPACK."""
+    m = M.reshape(-1, 16).T
+    inv = np.empty_like(m)
+    det = _adjugate4x4(m, inv)
+    return (inv / det).T.reshape(M.shape)
+
+
+def _frustum_lines_numpy(ndc_from_view, lines, far, distance, out):
+    """NumPy implementation of `frustum_lines`, used when numba is not available."""
+    view_from_ndc = _inv4x4_batched(ndc_from_view)
+
+    # Compute the NDC z coordinate of a point at the given distance for each frame.
+    view_p = np.array([0.0, 0.0, -distance, 1.0])
+    ndc_p = ndc_from_view @ view_p
+    z = ndc_p[:, 2] / ndc_p[:, 3]
+
+    ndc_lines = np.ones((ndc_from_view.shape[0], lines.shape[0], 4))
+    ndc_lines[:, :, :2] = lines[:, :2]
+    ndc_lines[:, :, 2] = np.where(far, z[:, np.newaxis], lines[:, 2])
+
+    # Transform all frames to view space at once and apply perspective division.
+    view_lines = np.einsum("nij,nkj->nki", view_from_ndc, ndc_lines)
+    out[:] = view_lines[:, :, :3] / view_lines[:, :, 3:]
+
+
+@lru_cache()
+def _load_frustum_lines_numba():
+    """Import the numba kernel, returns None if numba cannot be imported."""
+    try:
+        from aitviewer.scene._camera_kernels_numba import frustum_lines_numba
+    except ImportError:
+        return None
+    return frustum_lines_numba
+
+
+def _warmup_numba():
+    if _load_frustum_lines_numba() is not None:
+        _numba_ready.set()
+
+
+def warmup_frustum_lines():
+    """Import and compile the numba kernel of `frustum_lines` in a background thread, if numba is installed."""
+    global _warmup_thread
+    if HAS_NUMBA and _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=_warmup_numba, daemon=True)
+        _warmup_thread.start()
+
+
+def _frustum_lines_numba(ndc_from_view, lines, far, distance, out):
+    """Numba implementation of `frustum_lines`, compiled on the first call if it is not warmed up yet."""
+    _load_frustum_lines_numba()(
+        np.ascontiguousarray(ndc_from_view, dtype=np.float64),
+        np.ascontiguousarray(lines, dtype=np.float64),
+        np.ascontiguousarray(far, dtype=np.bool_),
+        float(distance),
+        out,
+    )
+
+
+def frustum_lines(ndc_from_view, lines, far, distance, out):
+    """
+    Transform the frustum edges of a sequence of cameras from NDC to view space.
+    :param ndc_from_view: A np array of shape (N, 4, 4) with the projection matrix of each frame.
+    :param lines: A np array of shape (L, 3) with the NDC coordinates of the frustum line endpoints.
+    :param far: A boolean np array of shape (L) which is True for endpoints on the far side of the frustum, the z
+      coordinate of these points is replaced with the NDC z coordinate of a point at `distance` from the camera.
+    :param distance: Distance of the far side of the frustum from the camera.
+    :param out: A float32 np array of shape (N, L, 3) where the view space coordinates are written.
+    """
+    if _numba_ready.is_set():
+        _frustum_lines_numba(ndc_from_view, lines, far, distance, out)
+    else:
+        _frustum_lines_numpy(ndc_from_view, lines, far, distance, out)
@@ -0,0 +1,55 @@
+"""
+Copyright (C) 2022  ETH Zurich, Manuel Kaufmann, Velko Vechev, Dario Mylonopoulos
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import numba
+import numpy as np
+
+from aitviewer.scene._camera_kernels import _adjugate4x4
+
+# This module is imported by aitviewer.scene._camera_kernels on the first call to frustum_lines(). The explicit
+# signatures make numba compile (or load from its cache) the kernels at that point.
+_adjugate4x4_numba = numba.njit(cache=True, fastmath=True)(_adjugate4x4)
+
+
+@numba.njit("f8[:, ::1](f8[:, ::1])", cache=True, fastmath=True)
+def inv4x4(M):
+    """Closed-form inverse of a 4-by-4 matrix using the adjugate."""
+    inv = np.empty(16)
+    det = _adjugate4x4_numba(M.ravel(), inv)
+    return (inv / det).reshape((4, 4))
+
+
+@numba.njit("void(f8[:, :, ::1], f8[:, ::1], b1[::1], f8, f4[:, :, ::1])", cache=True, fastmath=True)
+def frustum_lines_numba(ndc_from_view, lines, far, distance, out):
+    """Numba implementation of `frustum_lines`."""
+    for n in range(ndc_from_view.shape[0]):
+        P = ndc_from_view[n]
+        view_from_ndc = inv4x4(P)
+
+        # Compute the NDC z coordinate of a point at the given distance.
+        z = (P[2, 3] - P[2, 2] * distance) / (P[3, 3] - P[3, 2] * distance)
+
+        v = np.empty(4)
+        for k in range(lines.shape[0]):
+            x = lines[k, 0]
+            y = lines[k, 1]
+            zk = z if far[k] else lines[k, 2]
+            for i in range(4):
+                v[i] = view_from_ndc[i, 0] * x + view_from_ndc[i, 1] * y + view_from_ndc[i, 2] * zk
+                v[i] += view_from_ndc[i, 3]
+            out[n, k, 0] = v[0] / v[3]
+            out[n, k, 1] = v[1] / v[3]
+            out[n, k, 2] = v[2] / v[3]
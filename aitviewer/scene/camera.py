@@ -14,10 +14,10 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import os
+import pickle
 from abc import ABC, abstractmethod
+from pathlib import Path
 
-import joblib
 import numpy as np
 from trimesh.transformations import rotation_matrix
 
@@ -25,6 +25,7 @@ from aitviewer.configuration import CONFIG as C
 from aitviewer.renderables.lines import Lines
 from aitviewer.renderables.meshes import Meshes
 from aitviewer.renderables.rigid_bodies import RigidBodies
+from aitviewer.scene._camera_kernels import frustum_lines, warmup_frustum_lines
 from aitviewer.scene.camera_utils import (
     look_at,
     normalize,
@@ -34,15 +35,106 @@ from aitviewer.scene.camera_utils import (
 from aitviewer.scene.node import Node
 from aitviewer.utils.decorators import hooked
 
+# Camera object geometry, shared by all Camera instances
+_CAM_VERTICES = np.array(
+    [
+        # Body
+        [0, 0, 0],
+        [-1, -1, 1],
+        [-1, 1, 1],
+        [1, -1, 1],
+        [1, 1, 1],
+        # Triangle front
+        [0.5, 1.1, 1],
+        [-0.5, 1.1, 1],
+        [0, 2, 1],
+        # Triangle back
+        [0.5, 1.1, 1],
+        [-0.5, 1.1, 1],
+        [0, 2, 1],
+    ],
+    dtype=np.float32,
+)
+
+# Scale dimensions
+_CAM_VERTICES[:, 0] *= 0.05
+_CAM_VERTICES[:, 1] *= 0.03
+_CAM_VERTICES[:, 2] *= 0.15
+
+# Slide such that the origin is in front of the object
+_CAM_VERTICES[:, 2] -= _CAM_VERTICES[1, 2] * 1.1
+
+# Reverse z since we use the opengl convention that camera forward is -z
+_CAM_VERTICES[:, 2] *= -1
+
+# Reverse x too to maintain a consistent triangle winding
+_CAM_VERTICES[:, 0] *= -1
+
+_CAM_FACES = np.array(
+    [
+        [0, 1, 2],
+        [0, 2, 4],
+        [0, 4, 3],
+        [0, 3, 1],
+        [1, 3, 2],
+        [4, 2, 3],
+        [5, 6, 7],
+        [8, 10, 9],
+    ],
+    dtype=np.int32,
+)
+
+# Endpoints of the frustum edges in NDC, the z coordinate of points on the far side (marked by _FRUSTUM_Z_MASK) is
+# replaced with the NDC z coordinate of a point at the requested distance from the camera.
+_FRUSTUM_TEMPLATE = np.array(
+    [
+        [-1, -1, -1],
+        [-1, 1, -1],
+        [-1, -1, 1],
+        [-1, 1, 1],
+        [1, -1, -1],
+        [1, 1, -1],
+        [1, -1, 1],
+        [1, 1, 1],
+        [-1, -1, -1],
+        [-1, -1, 1],
+        [-1, 1, -1],
+        [-1, 1, 1],
+        [1, -1, -1],
+        [1, -1, 1],
+        [1, 1, -1],
+        [1, 1, 1],
+        [-1, -1, -1],
+        [1, -1, -1],
+        [-1, -1, 1],
+        [1, -1, 1],
+        [-1, 1, -1],
+        [1, 1, -1],
+        [-1, 1, 1],
+        [1, 1, 1],
+    ],
+    dtype=np.float64,
+)
+_FRUSTUM_Z_MASK = _FRUSTUM_TEMPLATE[:, 2] > 0
+
 
 def _transform_vector(transform, vector):
     """Apply affine transformation (4-by-4 matrix) to a 3D vector."""
-    return (transform @ np.concatenate([vector, np.array([1])]))[:3]
+    return transform[:3, :3] @ vector + transform[:3, 3]
 
 
 def _transform_direction(transform, vector):
     """Apply affine transformation (4-by-4 matrix) to a 3D directon."""
-    return (transform @ np.concatenate([vector, np.array([0])]))[:3]
+    return transform[:3, :3] @ vector
+
+
+def _invert_rigid(transform):
+    """Invert a rigid transformation (4-by-4 matrix made of a rotation and a translation)."""
+    R_inv = transform[:3, :3].T
+    inv = np.eye(4, dtype=transform.dtype)
+    inv[:3, :3] = R_inv
+    inv[:3, 3] = -R_inv @ transform[:3, 3]
+    return inv
 
 
 class CameraInterface(ABC):
@@ -51,25 +143,38 @@ class CameraInterface(ABC):
     """
 
     def __init__(self):
-        self.projection_matrix = None
-        self.view_matrix = None
-        self.view_projection_matrix = None
+        # The matrices are written in place by update_matrices(), so the same arrays are reused for every frame.
+        self.projection_matrix = np.zeros((4, 4), dtype=np.float32)
+        self.view_matrix = np.zeros((4, 4), dtype=np.float32)
+        self.view_projection_matrix = np.zeros((4, 4), dtype=np.float32)
+        self._matrices_ready = False
+
+        # Parameters used for the last computation of the projection matrix, subclasses use this to skip recomputing
+        # the projection matrix when none of its parameters changed.
+        self._P_key = None
 
     def get_projection_matrix(self):
-        if self.projection_matrix is None:
+        if not self._matrices_ready:
             raise ValueError("update_matrices() must be called before to update the projection matrix")
         return self.projection_matrix
 
     def get_view_matrix(self):
-        if self.view_matrix is None:
+        if not self._matrices_ready:
             raise ValueError("update_matrices() must be called before to update the view matrix")
         return self.view_matrix
 
     def get_view_projection_matrix(self):
-        if self.view_projection_matrix is None:
+        if not self._matrices_ready:
             raise ValueError("update_matrices() must be called before to update the view-projection matrix")
         return self.view_projection_matrix
 
+    def _set_matrices(self, P, V):
+        """Copy the given projection and view matrices into the camera matrices, called by update_matrices()."""
+        np.copyto(self.projection_matrix, P)
+        np.copyto(self.view_matrix, V)
+        np.matmul(P, V, out=self.view_projection_matrix)
+        self._matrices_ready = True
+
     @abstractmethod
     def update_matrices(self, width, height):
         pass
@@ -118,62 +223,19 @@ class Camera(Node, CameraInterface):
          camera in the viewer
         """
         super(Camera, self).__init__(icon="\u0084", gui_material=False, **kwargs)
+        CameraInterface.__init__(self)
 
-        # Camera object geometry
-        vertices = np.array(
-            [
-                # Body
-                [0, 0, 0],
-                [-1, -1, 1],
-                [-1, 1, 1],
-                [1, -1, 1],
-                [1, 1, 1],
-                # Triangle front
-                [0.5, 1.1, 1],
-                [-0.5, 1.1, 1],
-                [0, 2, 1],
-                # Triangle back
-                [0.5, 1.1, 1],
-                [-0.5, 1.1, 1],
-                [0, 2, 1],
-            ],
-            dtype=np.float32,
-        )
-
-        # Scale dimensions
-        vertices[:, 0] *= 0.05
-        vertices[:, 1] *= 0.03
-        vertices[:, 2] *= 0.15
-
-        # Slide such that the origin is in front of the object
-        vertices[:, 2] -= vertices[1, 2] * 1.1
-
-        # Reverse z since we use the opengl convention that camera forward is -z
-        vertices[:, 2] *= -1
-
-        # Reverse x too to maintain a consistent triangle winding
-        vertices[:, 0] *= -1
-
-        faces = np.array(
-            [
-                [0, 1, 2],
-                [0, 2, 4],
-                [0, 4, 3],
-                [0, 3, 1],
-                [1, 3, 2],
-                [4, 2, 3],
-                [5, 6, 7],
-                [8, 10, 9],
-            ]
-        )
+        # Start compiling the frustum kernel now, so that it is ready when the frustum is first shown.
+        warmup_frustum_lines()
 
         self._active = False
         self.active_color = active_color
         self.inactive_color = inactive_color
 
+        # Meshes keeps a reference to the vertex array and allows modifying it, so every camera gets its own copy.
         self.mesh = Meshes(
-            vertices,
-            faces,
+            _CAM_VERTICES.copy(),
+            _CAM_FACES,
             cast_shadow=False,
             flat_shading=True,
             rotation=kwargs.get("rotation"),
@@ -235,62 +297,18 @@ class Camera(Node, CameraInterface):
         # Remove previous frustum if it exists
         self.hide_frustum()
 
-        # Compute lines for each frame
-        all_lines = np.zeros((self.n_frames, 24, 3), dtype=np.float32)
+        # Collect the projection matrix of each frame
+        ndc_from_view = np.zeros((self.n_frames, 4, 4))
         frame_id = self.current_frame_id
         for i in range(self.n_frames):
             # Set the current frame id to use the camera matrices from the respective frame
             self.current_frame_id = i
-
-            # Compute frustum coordinates
             self.update_matrices(width, height)
-            P = self.get_projection_matrix()
-            ndc_from_view = P
-            view_from_ndc = np.linalg.inv(ndc_from_view)
-
-            def transform(x):
-                v = view_from_ndc @ np.append(x, 1.0)
-                return v[:3] / v[3]
-
-            # Comput z coordinate of a point at the given distance
-            view_p = np.array([0.0, 0.0, -distance])
-            ndc_p = ndc_from_view @ np.concatenate([view_p, np.array([1])])
-
-            # Compute z after perspective division
-            z = ndc_p[2] / ndc_p[3]
-
-            lines = np.array(
-                [
-                    [-1, -1, -1],
-                    [-1, 1, -1],
-                    [-1, -1, z],
-                    [-1, 1, z],
-                    [1, -1, -1],
-                    [1, 1, -1],
-                    [1, -1, z],
-                    [1, 1, z],
-                    [-1, -1, -1],
-                    [-1, -1, z],
-                    [-1, 1, -1],
-                    [-1, 1, z],
-                    [1, -1, -1],
-                    [1, -1, z],
-                    [1, 1, -1],
-                    [1, 1, z],
-                    [-1, -1, -1],
-                    [1, -1, -1],
-                    [-1, -1, z],
-                    [1, -1, z],
-                    [-1, 1, -1],
-                    [1, 1, -1],
-                    [-1, 1, z],
-                    [1, 1, z],
-                ],
-                dtype=np.float32,
-            )
+            ndc_from_view[i] = self.get_projection_matrix()
 
-            lines = np.apply_along_axis(transform, 1, lines)
-            all_lines[i] = lines
+        # Transform the frustum edges of all frames to view space
+        all_lines = np.zeros((self.n_frames, _FRUSTUM_TEMPLATE.shape[0], 3), dtype=np.float32)
+        frustum_lines(ndc_from_view, _FRUSTUM_TEMPLATE, _FRUSTUM_Z_MASK, distance, all_lines)
 
         self.frustum = Lines(
             all_lines,
@@ -301,9 +319,8 @@ class Camera(Node, CameraInterface):
         )
         self.add(self.frustum, show_in_hierarchy=False)
 
-        ori = np.eye(3, dtype=np.float)
-        ori[:, 2] *= -1
-        self.origin = RigidBodies(np.array([0.0, 0.0, 0.0])[np.newaxis], ori[np.newaxis])
+        ori = np.diag(np.array([1.0, 1.0, -1.0], dtype=np.float32))
+        self.origin = RigidBodies(np.zeros((1, 3), dtype=np.float32), ori[np.newaxis])
         self.add(self.origin, show_in_hierarchy=False)
 
         self.current_frame_id = frame_id
@@ -329,8 +346,10 @@ class Camera(Node, CameraInterface):
             self.current_frame_id = i
 
             all_points[i] = self.position
-            # Flip the Z axis since we want to display the orientation with Z forward
-            all_oris[i] = self.rotation @ np.array([[1, 0, 0], [0, 1, 0], [0, 0, -1]])
+            all_oris[i] = self.rotation
+
+        # Flip the Z axis since we want to display the orientation with Z forward
+        all_oris[:, :, 2] *= -1
 
         path_spheres = RigidBodies(all_points, all_oris, radius=0.01, length=0.1, color=(0.92, 0.68, 0.2, 1.0))
         # Create lines only if there is more than one frame in the sequence.
@@ -448,6 +467,13 @@ class WeakPerspectiveCamera(Camera):
         self._up = np.array([0, 1, 0], dtype=np.float32)
         self._forward = -np.array([0, 0, 1], dtype=np.float32)
 
+        # The camera pose is fixed, so the view matrix is the same for all frames.
+        self._V = look_at(self.position, self.forward, np.array([0, 1, 0], dtype=np.float32))
+
+        # Projection matrix buffer, the entries that are not written in update_matrices() stay constant.
+        self._P = np.zeros((4, 4), dtype=np.float32)
+        self._P[3, 3] = 1.0
+
     @property
     def forward(self):
         return self._forward
@@ -468,25 +494,19 @@ class WeakPerspectiveCamera(Camera):
         camera_ar = self.cols / self.rows
         ar = camera_ar / window_ar
 
-        P = np.array(
-            [
-                [sx * ar, 0, 0, tx * sx * ar],
-                [0, sy, 0, -ty * sy],
-                [0, 0, -1, 0],
-                [0, 0, 0, 1],
-            ]
-        )
+        # Only write the non-zero entries of the projection matrix
+        P = self._P
+        P[0, 0] = sx * ar
+        P[0, 3] = tx * sx * ar
+        P[1, 1] = sy
+        P[1, 3] = -ty * sy
 
         znear, zfar = self.near, self.far
-        P[2][2] = 2.0 / (znear - zfar)
-        P[2][3] = (zfar + znear) / (znear - zfar)
-
-        V = look_at(self.position, self.forward, np.array([0, 1, 0]))
+        P[2, 2] = 2.0 / (znear - zfar)
+        P[2, 3] = (zfar + znear) / (znear - zfar)
 
         # Update camera matrices
-        self.projection_matrix = P.astype("f4")
-        self.view_matrix = V.astype("f4")
-        self.view_projection_matrix = np.matmul(P, V).astype("f4")
+        self._set_matrices(P, self._V)
 
     @hooked
     def gui(self, imgui):
@@ -548,6 +568,15 @@ class OpenCVCamera(Camera):
             self.K.shape[0] == 1 or self.Rt.shape[0] == 1 or self.K.shape[0] == self.Rt.shape[0]
         ), f"extrinsics and intrinsics array shape mismatch: {self.Rt.shape} and {self.K.shape}"
 
+        # Precompute the camera position, rotation and axes in world coordinates for each frame of the extrinsics.
+        R, t = self.Rt[:, :, :3], self.Rt[:, :, 3]
+        self._Rt_positions = -np.einsum("nji,nj->ni", R, t)
+        self._Rt_rotations = np.transpose(R, (0, 2, 1)).copy()
+        self._Rt_rotations[:, :, 1:] *= -1.0
+        self._Rt_forwards = R[:, 2].copy()
+        self._Rt_ups = -R[:, 1]
+        self._Rt_rights = R[:, 0].copy()
+
         kwargs["gui_affine"] = False
         super(OpenCVCamera, self).__init__(viewer=viewer, n_frames=max(self.K.shape[0], self.Rt.shape[0]), **kwargs)
         self.position = self.current_position
@@ -560,22 +589,28 @@ class OpenCVCamera(Camera):
         self.near = near if near is not None else C.znear
         self.far = far if far is not None else C.zfar
 
+        # View and projection matrix buffers, the entries that are not written in _compute_opengl_view_projection()
+        # stay constant.
+        self._V = np.zeros((4, 4), dtype=np.float32)
+        self._V[3, 3] = 1.0
+        self._P = np.zeros((4, 4), dtype=np.float32)
+        self._P[3, 2] = -1.0
+
     def on_frame_update(self):
         self.position = self.current_position
         self.rotation = self.current_rotation
 
+    @property
+    def _Rt_index(self):
+        return 0 if self.Rt.shape[0] == 1 else self.current_frame_id
+
     @property
     def current_position(self):
-        Rt = self.current_Rt
-        pos = -Rt[:, 0:3].T @ Rt[:, 3]
-        return pos
+        return self._Rt_positions[self._Rt_index]
 
     @property
     def current_rotation(self):
-        Rt = self.current_Rt
-        rot = np.copy(Rt[:, 0:3].T)
-        rot[:, 1:] *= -1.0
-        return rot
+        return self._Rt_rotations[self._Rt_index]
 
     @property
     def current_K(self):
@@ -584,75 +619,71 @@ class OpenCVCamera(Camera):
 
     @property
     def current_Rt(self):
-        Rt = self.Rt[0] if self.Rt.shape[0] == 1 else self.Rt[self.current_frame_id]
-        return Rt
+        return self.Rt[self._Rt_index]
 
     @property
     def forward(self):
-        return self.current_Rt[2, :3]
+        return self._Rt_forwards[self._Rt_index]
 
     @property
     def up(self):
-        return -self.current_Rt[1, :3]
+        return self._Rt_ups[self._Rt_index]
 
     @property
     def right(self):
-        return self.current_Rt[0, :3]
+        return self._Rt_rights[self._Rt_index]
 
     def compute_opengl_view_projection(self, width, height):
-        # Construct view and projection matrices which follow OpenGL conventions.
+        """Returns new view and projection matrices which follow OpenGL conventions."""
+        V, P = self._compute_opengl_view_projection(width, height)
+        return V.copy(), P.copy()
+
+    def _compute_opengl_view_projection(self, width, height):
+        # Construct view and projection matrices which follow OpenGL conventions, written into the self._V and
+        # self._P buffers which are overwritten by the next call.
         # Adapted from https://amytabb.com/tips/tutorials/2019/06/28/OpenCV-to-OpenGL-tutorial-essentials/
 
         # Compute view matrix V
-        lookat = np.copy(self.current_Rt)
+        V = self._V
+        V[:3] = self.current_Rt
         # Invert Y -> flip image bottom to top
         # Invert Z -> OpenCV has positive Z forward, we use negative Z forward
-        lookat[1:3, :] *= -1.0
-        V = np.vstack((lookat, np.array([0, 0, 0, 1])))
-
-        # Compute projection matrix P
-        K = self.current_K
-        rows, cols = self.rows, self.cols
-        near, far = self.near, self.far
-
-        # Compute number of columns that we would need in the image to preserve the aspect ratio
-        window_cols = width / height * rows
-
-        # Offset to center the image on the x direction
-        x_offset = (window_cols - cols) * 0.5
-
-        # Calibration matrix with added Z information and adapted to OpenGL coordinate
-        # system which has (0,0) at center and Y pointing up
-        Kgl = np.array(
-            [
-                [-K[0, 0], 0, -(cols - K[0, 2]) - x_offset, 0],
-                [0, -K[1, 1], (rows - K[1, 2]), 0],
-                [0, 0, -(near + far), -(near * far)],
-                [0, 0, -1, 0],
-            ]
-        )
-
-        # Transformation from pixel coordinates to normalized device coordinates used by OpenGL
-        NDC = np.array(
-            [
-                [-2 / window_cols, 0, 0, 1],
-                [0, -2 / rows, 0, -1],
-                [0, 0, 2 / (far - near), -(far + near) / (far - near)],
-                [0, 0, 0, 1],
-            ]
-        )
-
-        P = NDC @ Kgl
-
-        return V, P
+        V[1:3, :] *= -1.0
+
+        # Compute projection matrix P, only if one of its parameters changed since the last call. The key records both
+        # which intrinsics array is set and which of its frames is used.
+        K_index = 0 if self.K.shape[0] == 1 else self.current_frame_id
+        P_key = (width, height, id(self.K), K_index, self.cols, self.rows, self.near, self.far)
+        if P_key != self._P_key:
+            K = self.current_K
+            rows, cols = self.rows, self.cols
+            near, far = self.near, self.far
+
+            # Compute number of columns that we would need in the image to preserve the aspect ratio
+            window_cols = width / height * rows
+
+            # Offset to center the image on the x direction
+            x_offset = (window_cols - cols) * 0.5
+
+            # The projection matrix is the product of the calibration matrix, with added Z information and adapted to
+            # the OpenGL coordinate system which has (0,0) at center and Y pointing up, and of the transformation from
+            # pixel coordinates to normalized device coordinates. We directly write the non-zero entries of the product.
+            P = self._P
+            P[0, 0] = 2 * K[0, 0] / window_cols
+            P[0, 2] = 2 * (cols - K[0, 2] + x_offset) / window_cols - 1
+            P[1, 1] = 2 * K[1, 1] / rows
+            P[1, 2] = 1 - 2 * (rows - K[1, 2]) / rows
+            P[2, 2] = -(far + near) / (far - near)
+            P[2, 3] = -2 * far * near / (far - near)
+            self._P_key = P_key
+
+        return V, self._P
 
     def update_matrices(self, width, height):
-        V, P = self.compute_opengl_view_projection(width, height)
+        V, P = self._compute_opengl_view_projection(width, height)
 
         # Update camera matrices
-        self.projection_matrix = P.astype("f4")
-        self.view_matrix = V.astype("f4")
-        self.view_projection_matrix = np.matmul(P, V).astype("f4")
+        self._set_matrices(P, V)
 
     def to_pinhole_camera(self, target_distance=5, **kwargs) -> "PinholeCamera":
         """
@@ -669,8 +700,8 @@ class OpenCVCamera(Camera):
 
         # Compute position and target for each frame.
         # Pinhole camera currently does not support custom up direction.
-        positions = np.zeros((self.n_frames, 3))
-        targets = np.zeros((self.n_frames, 3))
+        positions = np.zeros((self.n_frames, 3), dtype=np.float32)
+        targets = np.zeros((self.n_frames, 3), dtype=np.float32)
         for i in range(self.n_frames):
             self.current_frame_id = i
             positions[i] = self.position
@@ -744,7 +775,7 @@ class PinholeCamera(Camera):
             positions.shape[0] == 1 or targets.shape[0] == 1 or positions.shape[0] == targets.shape[0]
         ), f"position and target array shape mismatch: {positions.shape} and {targets.shape}"
 
-        self._world_up = np.array([0.0, 1.0, 0.0])
+        self._world_up = np.array([0.0, 1.0, 0.0], dtype=np.float32)
         self._targets = targets
         super(PinholeCamera, self).__init__(position=position, n_frames=targets.shape[0], viewer=viewer, **kwargs)
 
@@ -758,7 +789,6 @@ class PinholeCamera(Camera):
     @property
     def forward(self):
         forward = self.current_target - self.position
-        forward = forward / np.linalg.norm(forward)
         return forward / np.linalg.norm(forward)
 
     @property
@@ -777,19 +807,30 @@ class PinholeCamera(Camera):
 
     @property
     def rotation(self):
-        return np.array([-self.right, self.up, -self.forward]).T
+        forward = self.forward
+        right = normalize(np.cross(self._world_up, forward))
+        up = np.cross(forward, right)
+
+        rot = np.empty((3, 3), dtype=np.float32)
+        rot[:, 0] = -right
+        rot[:, 1] = up
+        rot[:, 2] = -forward
+        return rot
 
     def update_matrices(self, width, height):
-        # Compute projection matrix.
-        P = perspective_projection(np.deg2rad(self.fov), width / height, self.near, self.far)
+        # Compute projection matrix, only if one of its parameters changed since the last update.
+        P_key = (width, height, self.fov, self.near, self.far)
+        if P_key != self._P_key:
+            P = perspective_projection(np.deg2rad(self.fov), width / height, self.near, self.far)
+            self._P_key = P_key
+        else:
+            P = self.projection_matrix
 
         # Compute view matrix.
         V = look_at(self.position, self.current_target, self._world_up)
 
         # Update camera matrices.
-        self.projection_matrix = P.astype("f4")
-        self.view_matrix = V.astype("f4")
-        self.view_projection_matrix = np.matmul(P, V).astype("f4")
+        self._set_matrices(P, V)
 
     def to_opencv_camera(self, **kwargs) -> OpenCVCamera:
         """
@@ -800,7 +841,7 @@ class PinholeCamera(Camera):
 
         cols, rows = self.cols, self.rows
         # Compute extrinsics for each frame.
-        Rts = np.zeros((self.n_frames, 3, 4))
+        Rts = np.zeros((self.n_frames, 3, 4), dtype=np.float32)
         for i in range(self.n_frames):
             self.current_frame_id = i
             self.update_matrices(cols, rows)
@@ -814,13 +855,14 @@ class PinholeCamera(Camera):
 
         # Compute intrinsics.
         f = 1.0 / np.tan(np.radians(self.fov / 2))
-        c0 = np.array([cols / 2.0, rows / 2.0])
+        c0 = np.array([cols / 2.0, rows / 2.0], dtype=np.float32)
         K = np.array(
             [
                 [f * 0.5 * rows, 0.0, c0[0]],
                 [0.0, f * 0.5 * rows, c0[1]],
                 [0.0, 0.0, 1.0],
-            ]
+            ],
+            dtype=np.float32,
         )
 
         return OpenCVCamera(
@@ -883,9 +925,9 @@ class ViewerCamera(CameraInterface):
         self.ortho_size = 1.0 if orthographic is None else orthographic
 
         # Default camera settings.
-        self._position = np.array([0.0, 0.0, 2.5])
-        self._target = np.array([0.0, 0.0, 0.0])
-        self._up = np.array([0.0, 1.0, 0.0])
+        self._position = np.array([0.0, 0.0, 2.5], dtype=np.float32)
+        self._target = np.array([0.0, 0.0, 0.0], dtype=np.float32)
+        self._up = np.array([0.0, 1.0, 0.0], dtype=np.float32)
 
         self.ZOOM_FACTOR = 4
         self.ROT_FACTOR = 0.0025
@@ -950,6 +992,12 @@ class ViewerCamera(CameraInterface):
     def forward(self):
         return normalize(self.target - self.position)
 
+    def _fwd_and_dist(self):
+        """Returns the normalized view direction and the distance from the camera position to the target."""
+        d = self.target - self.position
+        n = np.linalg.norm(d)
+        return d / n, n
+
     @property
     def up(self):
         return self._up
@@ -972,9 +1020,8 @@ class ViewerCamera(CameraInterface):
 
     def save_cam(self):
         """Saves the current camera parameters"""
-        cam_dir = C.export_dir + "/camera_params/"
-        if not os.path.exists(cam_dir):
-            os.makedirs(cam_dir)
+        cam_dir = Path(C.export_dir) / "camera_params"
+        cam_dir.mkdir(parents=True, exist_ok=True)
 
         cam_dict = {}
         cam_dict["position"] = self.position
@@ -986,15 +1033,23 @@ class ViewerCamera(CameraInterface):
         cam_dict["near"] = self.near
         cam_dict["far"] = self.far
 
-        joblib.dump(cam_dict, cam_dir + "cam_params.pkl")
+        with open(cam_dir / "cam_params.pkl", "wb") as f:
+            pickle.dump(cam_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     def load_cam(self):
         """Loads the camera parameters"""
-        cam_dir = C.export_dir + "/camera_params/"
-        if not os.path.exists(cam_dir):
+        cam_path = Path(C.export_dir) / "camera_params" / "cam_params.pkl"
+        if not cam_path.exists():
             print("camera config does not exist")
         else:
-            cam_dict = joblib.load(cam_dir + "cam_params.pkl")
+            try:
+                with open(cam_path, "rb") as f:
+                    cam_dict = pickle.load(f)
+            except pickle.UnpicklingError:
+                # Camera parameters saved by older versions were written with joblib.
+                import joblib
+
+                cam_dict = joblib.load(cam_path)
             self.position = cam_dict["position"]
             self.target = cam_dict["target"]
             self.up = cam_dict["up"]
@@ -1005,21 +1060,36 @@ class ViewerCamera(CameraInterface):
             self.far = cam_dict["far"]
 
     def update_matrices(self, width, height):
-        # Compute projection matrix.
-        if self.is_ortho:
-            yscale = self.ortho_size
-            xscale = width / height * yscale
-            P = orthographic_projection(xscale, yscale, self.near, self.far)
+        # Compute projection matrix, only if one of its parameters changed since the last update.
+        P_key = (width, height, self.fov, self.is_ortho, self.ortho_size, self.near, self.far)
+        if P_key != self._P_key:
+            if self.is_ortho:
+                yscale = self.ortho_size
+                xscale = width / height * yscale
+                P = orthographic_projection(xscale, yscale, self.near, self.far)
+            else:
+                P = perspective_projection(np.deg2rad(self.fov), width / height, self.near, self.far)
+            self._P_key = P_key
         else:
-            P = perspective_projection(np.deg2rad(self.fov), width / height, self.near, self.far)
+            P = self.projection_matrix
 
-        # Compute view matrix.
-        V = look_at(self.position, self.target, self.up)
+        # Compute view matrix directly into the view matrix buffer.
+        self._look_at_inplace(self.view_matrix)
 
         # Update camera matrices.
-        self.projection_matrix = P.astype("f4")
-        self.view_matrix = V.astype("f4")
-        self.view_projection_matrix = np.matmul(P, V).astype("f4")
+        self._set_matrices(P, self.view_matrix)
+
+    def _look_at_inplace(self, out):
+        """Write the view matrix of the camera into `out`, this is equivalent to look_at(position, target, up)."""
+        fwd, _ = self._fwd_and_dist()
+        right = normalize(np.cross(fwd, self.up))
+        up = np.cross(right, fwd)
+
+        out[0, :3] = right
+        out[1, :3] = up
+        out[2, :3] = -fwd
+        out[:3, 3] = -(out[:3, :3] @ self.position)
+        out[3] = (0.0, 0.0, 0.0, 1.0)
 
     def dolly_zoom(self, speed, move_target=False, constant_speed=False):
         """
@@ -1032,8 +1102,8 @@ class ViewerCamera(CameraInterface):
         self.ortho_size = max(0.0001, self.ortho_size)
 
         # Scale the speed in proportion to the norm (i.e. camera moves slower closer to the target)
-        norm = max(np.linalg.norm(self.position - self.target), 2)
-        fwd = self.forward
+        fwd, dist = self._fwd_and_dist()
+        norm = max(dist, 2)
 
         # Adjust speed according to config
         speed *= C.camera_zoom_speed
@@ -1046,18 +1116,19 @@ class ViewerCamera(CameraInterface):
         else:
             # Clamp movement size to avoid surpassing the target
             movement_length = speed * norm
-            max_movement_length = max(np.linalg.norm(self.target - self.position) - 0.01, 0.0)
+            max_movement_length = max(dist - 0.01, 0.0)
 
             # Update position
             self.position += fwd * min(movement_length, max_movement_length)
 
     def pan(self, mouse_dx, mouse_dy):
         """Move the camera in the image plane."""
-        sideways = normalize(np.cross(self.forward, self.up))
-        up = np.cross(sideways, self.forward)
+        fwd, dist = self._fwd_and_dist()
+        sideways = normalize(np.cross(fwd, self.up))
+        up = np.cross(sideways, fwd)
 
         # scale speed according to distance from target
-        speed = max(np.linalg.norm(self.target - self.position) * 0.1, 0.1)
+        speed = max(dist * 0.1, 0.1)
 
         speed_x = mouse_dx * self.PAN_FACTOR * speed
         speed_y = mouse_dy * self.PAN_FACTOR * speed
@@ -1072,13 +1143,16 @@ class ViewerCamera(CameraInterface):
         """Rotate around camera's up-axis by given angle (in radians)."""
         if np.abs(angle) < 1e-8:
             return
-        cam_pose = np.linalg.inv(self.view_matrix)
-        y_axis = cam_pose[:3, 1]
+        # The camera's y axis in world coordinates is the second column of the inverse of the view matrix, since the
+        # rotation part of the view matrix is orthonormal this is the second row of the view matrix.
+        y_axis = self.get_view_matrix()[1, :3]
         rot = rotation_matrix(angle, y_axis, self.target)
         self.position = _transform_vector(rot, self.position)
 
     def _rotation_from_mouse_delta(self, mouse_dx: int, mouse_dy: int):
-        z_axis = -self.forward
+        fwd, _ = self._fwd_and_dist()
+        right = normalize(np.cross(self.up, fwd))
+        z_axis = -fwd
         dot = np.dot(z_axis, self.up)
         rot = np.eye(4)
 
@@ -1086,11 +1160,11 @@ class ViewerCamera(CameraInterface):
         if not (mouse_dy > 0 and dot > 0 and 1 - dot < 0.001) and not (mouse_dy < 0 and dot < 0 and 1 + dot < 0.001):
             # We are either hovering exactly below or above the scene's target but we want to move away or we are
             # not hitting the singularity anyway.
-            x_axis = -self.right
+            x_axis = -right
             rot_x = rotation_matrix(self.ROT_FACTOR * -mouse_dy, x_axis, self.target)
             rot = rot_x @ rot
 
-        y_axis = np.cross(self.forward, self.right)
+        y_axis = np.cross(fwd, right)
         x_speed = self.ROT_FACTOR / 10 if 1 - np.abs(dot) < 0.01 else self.ROT_FACTOR
         rot = rotation_matrix(x_speed * -mouse_dx, y_axis, self.target) @ rot
         return rot
@@ -1186,7 +1260,7 @@ class ViewerCamera(CameraInterface):
         screen_y *= scale
 
         pixel_2d = np.array([screen_x, screen_y, 0 if self.is_ortho else -1])
-        cam2world = np.linalg.inv(self.view_matrix)
+        cam2world = _invert_rigid(self.get_view_matrix())
         pixel_3d = _transform_vector(cam2world, pixel_2d)
         if self.is_ortho:
             ray_origin = pixel_3d
@@ -1201,9 +1275,9 @@ class ViewerCamera(CameraInterface):
 
     def move_with_animation(self, end_position, end_target, time=0.25):
         self._animation_start_position = self.position.copy()
-        self._animation_end_position = np.array(end_position)
+        self._animation_end_position = np.array(end_position, dtype=np.float32)
         self._animation_start_target = self.target.copy()
-        self._animation_end_target = np.array(end_target)
+        self._animation_end_target = np.array(end_target, dtype=np.float32)
         self._animation_total_time = time
         self._animation_t = 0.0
         self.animating = True
@@ -36,12 +36,12 @@ def look_at(position, target, up):
     camera_up = np.cross(forward, right)
 
     # We directly create the inverse matrix (i.e. world2cam) because this is typically how look-at is define.
-    rot = np.eye(4)
+    rot = np.eye(4, dtype=np.float32)
     rot[0, :3] = right
     rot[1, :3] = camera_up
     rot[2, :3] = forward
 
-    trans = np.eye(4)
+    trans = np.eye(4, dtype=np.float32)
     trans[:3, 3] = -position
 
     return rot @ trans
@@ -49,7 +49,7 @@ def look_at(position, target, up):
 
 def orthographic_projection(scale_x, scale_y, znear, zfar):
     """Returns an orthographic projection matrix."""
-    P = np.zeros((4, 4))
+    P = np.zeros((4, 4), dtype=np.float32)
     P[0][0] = 1.0 / scale_x
     P[1][1] = 1.0 / scale_y
     P[2][2] = 2.0 / (znear - zfar)
@@ -63,7 +63,7 @@ def perspective_projection(fov, aspect_ratio, znear, zfar):
     ar = aspect_ratio
     t = np.tan(fov / 2.0)
 
-    P = np.zeros((4, 4))
+    P = np.zeros((4, 4), dtype=np.float32)
     P[0][0] = 1.0 / (ar * t)
     P[1][1] = 1.0 / t
     P[3][2] = -1.0
@@ -181,7 +181,7 @@ class Light(Node):
 
         size = self.shadow_map_size
         view_from_ndc = np.linalg.inv(orthographic_projection(size, size, self.shadow_map_near, self.shadow_map_far))
-        lines = np.apply_along_axis(lambda x: (view_from_ndc @ np.append(x, 1.0))[:3], 1, lines)
+        lines = lines @ view_from_ndc[:3, :3].T + view_from_ndc[:3, 3]
 
         if self._debug_lines is None:
             self._debug_lines = Lines(lines, r_base=0.05, mode="lines", cast_shadow=False, is_selectable=False)
@@ -0,0 +1,232 @@
+import threading
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from aitviewer.scene import _camera_kernels
+from aitviewer.scene._camera_kernels import (
+    HAS_NUMBA,
+    _frustum_lines_numba,
+    _frustum_lines_numpy,
+    _inv4x4_batched,
+    frustum_lines,
+    warmup_frustum_lines,
+)
+from aitviewer.scene.camera import (
+    _FRUSTUM_TEMPLATE,
+    _FRUSTUM_Z_MASK,
+    OpenCVCamera,
+    ViewerCamera,
+    _invert_rigid,
+)
+from aitviewer.scene.camera_utils import (
+    look_at,
+    orthographic_projection,
+    perspective_projection,
+)
+
+
+def opencv_projection_reference(K, cols, rows, near, far, width, height):
+    """Projection matrix of an OpenCVCamera computed as the product of the calibration and NDC matrices."""
+    window_cols = width / height * rows
+    x_offset = (window_cols - cols) * 0.5
+    Kgl = np.array(
+        [
+            [-K[0, 0], 0, -(cols - K[0, 2]) - x_offset, 0],
+            [0, -K[1, 1], (rows - K[1, 2]), 0],
+            [0, 0, -(near + far), -(near * far)],
+            [0, 0, -1, 0],
+        ]
+    )
+    NDC = np.array(
+        [
+            [-2 / window_cols, 0, 0, 1],
+            [0, -2 / rows, 0, -1],
+            [0, 0, 2 / (far - near), -(far + near) / (far - near)],
+            [0, 0, 0, 1],
+        ]
+    )
+    return NDC @ Kgl
+
+
+def frustum_lines_reference(ndc_from_view, distance):
+    """Frustum lines of each frame computed with a homogeneous transform by the inverse of each projection matrix."""
+    all_lines = []
+    for P in ndc_from_view:
+        ndc_p = P @ np.array([0.0, 0.0, -distance, 1.0])
+        ndc_lines = np.ones((_FRUSTUM_TEMPLATE.shape[0], 4))
+        ndc_lines[:, :3] = _FRUSTUM_TEMPLATE
+        ndc_lines[_FRUSTUM_Z_MASK, 2] = ndc_p[2] / ndc_p[3]
+        view_lines = ndc_lines @ np.linalg.inv(P).T
+        all_lines.append(view_lines[:, :3] / view_lines[:, 3:])
+    return np.array(all_lines)
+
+
+def random_projection_matrices(rng, n):
+    """Random perspective and orthographic projection matrices of shape (2 * n, 4, 4)."""
+    Ps = []
+    for _ in range(n):
+        near, far = rng.uniform(0.01, 1.0), rng.uniform(10.0, 100.0)
+        Ps.append(perspective_projection(np.deg2rad(rng.uniform(20, 90)), rng.uniform(0.5, 2.0), near, far))
+        Ps.append(orthographic_projection(rng.uniform(0.5, 5.0), rng.uniform(0.5, 5.0), near, far))
+    return np.array(Ps, dtype=np.float64)
+
+
+def test_frustum_lines_numpy():
+    rng = np.random.default_rng(0)
+    ndc_from_view = random_projection_matrices(rng, 10)
+    out = np.zeros((ndc_from_view.shape[0], _FRUSTUM_TEMPLATE.shape[0], 3), dtype=np.float32)
+    _frustum_lines_numpy(ndc_from_view, _FRUSTUM_TEMPLATE, _FRUSTUM_Z_MASK, 5.0, out)
+    assert np.allclose(out, frustum_lines_reference(ndc_from_view, 5.0), rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.skipif(not HAS_NUMBA, reason="numba not installed")
+def test_frustum_lines_numba():
+    rng = np.random.default_rng(0)
+    ndc_from_view = random_projection_matrices(rng, 10)
+    out_numpy = np.zeros((ndc_from_view.shape[0], _FRUSTUM_TEMPLATE.shape[0], 3), dtype=np.float32)
+    out_numba = np.zeros_like(out_numpy)
+    _frustum_lines_numpy(ndc_from_view, _FRUSTUM_TEMPLATE, _FRUSTUM_Z_MASK, 5.0, out_numpy)
+    _frustum_lines_numba(ndc_from_view, _FRUSTUM_TEMPLATE, _FRUSTUM_Z_MASK, 5.0, out_numba)
+    assert np.allclose(out_numba, out_numpy, rtol=1e-5, atol=1e-5)
+
+
+def test_frustum_lines_uses_numpy_until_warmed_up(monkeypatch):
+    # frustum_lines() must never compile the numba kernel itself, since it is called from the UI thread.
+    def fail(*args):
+        raise AssertionError("numba kernel used before warmup")
+
+    monkeypatch.setattr(_camera_kernels, "_numba_ready", threading.Event())
+    monkeypatch.setattr(_camera_kernels, "_frustum_lines_numba", fail)
+
+    rng = np.random.default_rng(0)
+    ndc_from_view = random_projection_matrices(rng, 2)
+    out = np.zeros((ndc_from_view.shape[0], _FRUSTUM_TEMPLATE.shape[0], 3), dtype=np.float32)
+    frustum_lines(ndc_from_view, _FRUSTUM_TEMPLATE, _FRUSTUM_Z_MASK, 5.0, out)
+    assert np.allclose(out, frustum_lines_reference(ndc_from_view, 5.0), rtol=1e-4, atol=1e-4)
+
+
+def test_frustum_lines_warmup():
+    warmup_frustum_lines()
+    if _camera_kernels._warmup_thread is not None:
+        _camera_kernels._warmup_thread.join()
+    assert _camera_kernels._numba_ready.is_set() == HAS_NUMBA
+
+    rng = np.random.default_rng(0)
+    ndc_from_view = random_projection_matrices(rng, 2)
+    out = np.zeros((ndc_from_view.shape[0], _FRUSTUM_TEMPLATE.shape[0], 3), dtype=np.float32)
+    frustum_lines(ndc_from_view, _FRUSTUM_TEMPLATE, _FRUSTUM_Z_MASK, 5.0, out)
+    assert np.allclose(out, frustum_lines_reference(ndc_from_view, 5.0), rtol=1e-4, atol=1e-4)
+
+
+def test_opencv_camera_projection():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        cols, rows = rng.integers(320, 1920, size=2)
+        width, height = rng.integers(320, 1920, size=2)
+        near, far = rng.uniform(0.01, 1.0), rng.uniform(10.0, 1000.0)
+
+        K = np.eye(3)
+        K[0, 0], K[1, 1] = rng.uniform(200, 2000, size=2)
+        K[0, 2], K[1, 2] = cols / 2 + rng.uniform(-50, 50), rows / 2 + rng.uniform(-50, 50)
+        Rt = np.zeros((3, 4))
+        Rt[:, :3] = Rotation.random(random_state=rng.integers(1 << 31)).as_matrix()
+        Rt[:, 3] = rng.uniform(-5, 5, size=3)
+
+        camera = OpenCVCamera(K, Rt, cols, rows, near=near, far=far)
+        camera.update_matrices(width, height)
+
+        P = opencv_projection_reference(K, cols, rows, near, far, width, height)
+        assert np.allclose(camera.get_projection_matrix(), P, rtol=1e-5, atol=1e-6)
+
+
+def test_opencv_camera_show_frustum():
+    rng = np.random.default_rng(0)
+    n_frames, cols, rows, width, height = 5, 1280, 720, 1600, 900
+    near, far, distance = 0.1, 100.0, 3.0
+
+    K = np.tile(np.eye(3), (n_frames, 1, 1))
+    K[:, 0, 0], K[:, 1, 1] = rng.uniform(500, 1500, size=(2, n_frames))
+    K[:, 0, 2], K[:, 1, 2] = cols / 2 + rng.uniform(-50, 50, n_frames), rows / 2 + rng.uniform(-50, 50, n_frames)
+    Rt = np.zeros((3, 4))
+    Rt[:, :3] = Rotation.random(random_state=0).as_matrix()
+    Rt[:, 3] = rng.uniform(-5, 5, size=3)
+
+    camera = OpenCVCamera(K, Rt, cols, rows, near=near, far=far)
+    camera.show_frustum(width, height, distance)
+
+    P = np.array([opencv_projection_reference(k, cols, rows, near, far, width, height) for k in K])
+    expected = frustum_lines_reference(P, distance)
+    assert camera.frustum.lines.shape == (n_frames, _FRUSTUM_TEMPLATE.shape[0], 3)
+    assert np.allclose(camera.frustum.lines, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_inv4x4_batched():
+    rng = np.random.default_rng(0)
+    M = rng.uniform(-1, 1, size=(50, 4, 4)) + np.eye(4) * 2
+    assert np.allclose(_inv4x4_batched(M), np.linalg.inv(M))
+
+
+def test_invert_rigid():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        position, target = rng.uniform(-10, 10, size=(2, 3))
+        V = look_at(position, target, np.array([0.0, 1.0, 0.0]))
+        V_inv = np.linalg.inv(V)
+        assert np.allclose(_invert_rigid(V), V_inv, atol=1e-5)
+        # rotate_azimuth reads the camera's y axis from the view matrix directly.
+        assert np.allclose(V[1, :3], V_inv[:3, 1], atol=1e-6)
+
+
+def test_viewer_camera_requires_matrices():
+    camera = ViewerCamera()
+    with pytest.raises(ValueError):
+        camera.rotate_azimuth(0.1)
+    with pytest.raises(ValueError):
+        camera.get_ray(10, 10, 100, 100)
+
+    camera.update_matrices(100, 100)
+    camera.rotate_azimuth(0.1)
+    assert np.all(np.isfinite(camera.position))
+
+
+def test_viewer_camera_look_at_inplace():
+    rng = np.random.default_rng(0)
+    camera = ViewerCamera()
+    out = np.zeros((4, 4), dtype=np.float32)
+    for i in range(200):
+        position, target = rng.uniform(-10, 10, size=(2, 3)).astype(np.float32)
+        # Use the default up vector for some poses and random ones for the rest.
+        up = np.array([0.0, 1.0, 0.0], dtype=np.float32) if i % 4 == 0 else rng.normal(size=3).astype(np.float32)
+        camera.position, camera.target, camera.up = position, target, up
+
+        camera._look_at_inplace(out)
+        assert np.array_equal(out, look_at(camera.position, camera.target, camera.up))
+
+
+def test_opencv_camera_view_projection_returns_new_arrays():
+    Rt = np.zeros((2, 3, 4))
+    Rt[:, :, :3] = Rotation.random(2, random_state=0).as_matrix()
+    camera = OpenCVCamera(np.array([[500.0, 0, 320], [0, 500, 240], [0, 0, 1]]), Rt, 640, 480)
+
+    V, P = camera.compute_opengl_view_projection(640, 480)
+    V_copy, P_copy = V.copy(), P.copy()
+    camera.current_frame_id = 1
+    camera.compute_opengl_view_projection(1280, 480)
+    assert np.array_equal(V, V_copy) and np.array_equal(P, P_copy)
+
+
+def test_opencv_camera_projection_after_setting_K():
+    K = np.array([[500.0, 0, 320], [0, 500, 240], [0, 0, 1]])
+    Rt = np.zeros((3, 4))
+    Rt[:, :3] = np.eye(3)
+    camera = OpenCVCamera(K, Rt, 640, 480, near=0.1, far=100.0)
+    camera.update_matrices(800, 600)
+
+    K_new = K.copy()
+    K_new[0, 0], K_new[1, 1] = 800.0, 900.0
+    camera.K = K_new[np.newaxis]
+    camera.update_matrices(800, 600)
+    P = opencv_projection_reference(K_new, 640, 480, 0.1, 100.0, 800, 600)
+    assert np.allclose(camera.get_projection_matrix(), P, rtol=1e-5, atol=1e-6)